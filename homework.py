@@ -1,7 +1,10 @@
 import os
 import time
+import atexit
 import logging
+import queue
 from http import HTTPStatus
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 import requests
 import telebot
@@ -12,13 +15,17 @@ from exceptions import (MissingEnvironmentVariableError,
                         APIRequestError,
                         APIResponseError)
 
-load_dotenv()
+if not globals().get('_DOTENV_LOADED'):
+    load_dotenv()
+    _DOTENV_LOADED = True
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
 RETRY_PERIOD = 600
+REQUEST_TIMEOUT = (5, 30)
+_HTTP_OK = int(HTTPStatus.OK)
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
@@ -28,19 +35,36 @@ HOMEWORK_VERDICTS = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
+RESPONSE_REQUIRED_KEYS = frozenset(('homeworks',))
+HOMEWORK_REQUIRED_KEYS = frozenset(('homework_name', 'status'))
+_MISSING = object()
+ERROR_MESSAGE = 'Сбой в работе программы: {error}'
+
+LOG_FORMAT = (
+    '%(asctime)s, %(levelname)s, '
+    '[%(funcName)s:%(lineno)d], %(message)s'
+)
+
 log_file = os.path.expanduser('~/bot.log')
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format=(
-        '%(asctime)s, %(levelname)s, '
-        '[%(funcName)s:%(lineno)d], %(message)s'
-    ),
-    handlers=[
+if not globals().get('log_listener'):
+    log_queue = queue.Queue(-1)
+
+    log_listener = QueueListener(
+        log_queue,
         logging.StreamHandler(),
-        logging.FileHandler(log_file, mode='a', encoding='utf-8')
-    ]
-)
+        RotatingFileHandler(
+            log_file, maxBytes=10_000_000, backupCount=3, encoding='utf-8'
+        ),
+        respect_handler_level=True
+    )
+    log_listener.start()
+    atexit.register(log_listener.stop)
+
+    log_handler = QueueHandler(log_queue)
+    log_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    logging.basicConfig(level=logging.DEBUG, handlers=[log_handler])
 logger = logging.getLogger(__name__)
 
 
@@ -54,25 +78,23 @@ def check_tokens():
     Returns:
         bool: True, если все переменные окружения установлены.
     """
+    if all((PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)):
+        return True
+
     tokens = (
         (PRACTICUM_TOKEN, 'PRACTICUM_TOKEN'),
         (TELEGRAM_TOKEN, 'TELEGRAM_TOKEN'),
         (TELEGRAM_CHAT_ID, 'TELEGRAM_CHAT_ID')
     )
-
-    missing_tokens = []
-
-    for token, name in tokens:
-        if not token:
-            logger.critical(
-                f'Отсутствует обязательная переменная окружения: "{name}"')
-            missing_tokens.append(name)
-
-    if missing_tokens:
-        raise MissingEnvironmentVariableError(
-            f'Отсутствуют обязательные переменные окружения: '
-            f'{", ".join(missing_tokens)}'
-        )
+    missing_tokens = [name for token, name in tokens if not token]
+    for name in missing_tokens:
+        logger.critical(
+            'Отсутствует обязательная переменная окружения: "%s"', name)
+
+    raise MissingEnvironmentVariableError(
+        f'Отсутствуют обязательные переменные окружения: '
+        f'{", ".join(missing_tokens)}'
+    )
 
 
 def send_message(bot, message):
@@ -88,9 +110,9 @@ def send_message(bot, message):
     try:
         bot.send_message(TELEGRAM_CHAT_ID, message)
     except telebot.apihelper.ApiTelegramException as error:
-        logger.error(f'Ошибка при отправке сообщения в Telegram: {error}')
+        logger.error('Ошибка при отправке сообщения в Telegram: %s', error)
         return False
-    logger.debug(f'Бот отправил сообщение: "{message}"')
+    logger.debug('Бот отправил сообщение: "%s"', message)
     return True
 
 
@@ -111,11 +133,14 @@ def get_api_answer(timestamp):
         'url': ENDPOINT,
         'headers': HEADERS,
         'params': {'from_date': timestamp},
+        'timeout': REQUEST_TIMEOUT,
     }
 
     logger.debug(
-        'Начинаем запрос к API: "{url}". Параметры: '
-        '{params}, Заголовки: {headers}'.format(**request_params)
+        'Начинаем запрос к API: "%s". Параметры: %s, Заголовки: %s',
+        request_params['url'],
+        request_params['params'],
+        request_params['headers']
     )
 
     try:
@@ -128,7 +153,7 @@ def get_api_answer(timestamp):
             )
         )
 
-    if response.status_code != HTTPStatus.OK:
+    if response.status_code != _HTTP_OK:
         raise APIRequestError(
             'Эндпоинт {url} недоступен. Код ответа: '
             '{status_code} ({status_phrase}), Причина: {reason}, '
@@ -159,8 +184,12 @@ def check_response(response):
     if not isinstance(response, dict):
         raise TypeError('Ответ API должен быть словарём')
 
-    if 'homeworks' not in response:
-        raise APIResponseError('В ответе API отсутствует ключ "homeworks"')
+    missing_keys = RESPONSE_REQUIRED_KEYS - response.keys()
+    if missing_keys:
+        raise APIResponseError(
+            'В ответе API отсутствуют ключи: '
+            f'{", ".join(sorted(missing_keys))}'
+        )
 
     homeworks = response['homeworks']
 
@@ -183,57 +212,83 @@ def parse_status(homework):
         KeyError: Если отсутствуют обязательные ключи.
         ValueError: Если статус работы неизвестен.
     """
-    if 'homework_name' not in homework:
+    missing_keys = HOMEWORK_REQUIRED_KEYS - homework.keys()
+    if missing_keys:
         raise KeyError(
-            'В информации о домашней работе отсутствует ключ '
-            '"homework_name"'
-        )
-    if 'status' not in homework:
-        raise KeyError(
-            'В информации о домашней работе отсутствует ключ '
-            '"status"'
+            'В информации о домашней работе отсутствуют ключи: '
+            f'{", ".join(sorted(missing_keys))}'
         )
 
     homework_name = homework['homework_name']
     homework_status = homework['status']
 
-    if homework_status not in HOMEWORK_VERDICTS:
+    verdict = HOMEWORK_VERDICTS.get(homework_status, _MISSING)
+    if verdict is _MISSING:
         raise ValueError(
             f'Недокументированный статус работы: {homework_status}')
 
-    verdict = HOMEWORK_VERDICTS[homework_status]
     return f'Изменился статус проверки работы "{homework_name}". {verdict}'
 
 
+def send_new_statuses(bot, homeworks, sent_messages):
+    """Отправляет в Telegram ещё не отправленные статусы домашних работ.
+
+    Работы обрабатываются от старых к новым. Работа, статус которой не
+    удалось разобрать, сообщается как ошибка и не мешает отправке
+    остальных. Отправка прекращается на первой неудачной попытке, чтобы
+    не нарушать порядок сообщений.
+
+    Args:
+        bot (telebot.TeleBot): Экземпляр бота.
+        homeworks (list): Список домашних работ из ответа API.
+        sent_messages (dict): Последнее отправленное сообщение
+            для каждой домашней работы; обновляется на месте.
+
+    Returns:
+        bool: True, если все новые статусы отправлены, иначе False.
+    """
+    for homework in reversed(homeworks):
+        try:
+            message = parse_status(homework)
+        except (KeyError, ValueError) as error:
+            message = ERROR_MESSAGE.format(error=error)
+            logger.error(message)
+        homework_name = homework.get('homework_name', message)
+        if sent_messages.get(homework_name) == message:
+            continue
+        if not send_message(bot, message):
+            return False
+        sent_messages[homework_name] = message
+    return True
+
+
 def main():
     """Основная логика работы бота."""
     check_tokens()
     bot = telebot.TeleBot(TELEGRAM_TOKEN)
     timestamp = int(time.time())
-    last_message = ''
+    sent_messages = {}
+    last_error = ''
 
     while True:
         try:
             response = get_api_answer(timestamp)
             homeworks = check_response(response)
+            last_error = ''
 
             if not homeworks:
                 logger.debug('Новых статусов нет')
                 continue
 
-            homework = homeworks[0]
-            message = parse_status(homework)
-
-            if message != last_message and send_message(bot, message):
-                last_message = message
+            if send_new_statuses(bot, homeworks, sent_messages):
                 timestamp = response.get('current_date', timestamp)
 
         except Exception as error:
-            error_message = f'Сбой в работе программы: {error}'
+            error_message = ERROR_MESSAGE.format(error=error)
             logger.error(error_message)
-            if error_message != last_message and send_message(bot,
-                                                              error_message):
-                last_message = error_message
+            if error_message != last_error and send_message(bot,
+                                                            error_message):
+                last_error = error_message
         finally:
             time.sleep(RETRY_PERIOD)
 